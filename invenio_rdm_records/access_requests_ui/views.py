@@ -6,16 +6,17 @@
 # it under the terms of the MIT License; see LICENSE file for more details.
 
 """Access request UI views."""
-from flask import abort, current_app, g, redirect, render_template, request
+from flask import abort, g, redirect, render_template, request
 from invenio_access.permissions import system_identity
 from invenio_i18n import lazy_gettext as _
-from invenio_mail.tasks import send_email
+from invenio_records_resources.services.uow import UnitOfWork
 from invenio_requests.proxies import current_requests_service
 from invenio_requests.views.decorators import pass_request
 
 from ..proxies import current_rdm_records_service as current_service
 from ..requests.access.requests import GuestAcceptAction
 from ..services.errors import AccessRequestExistsError
+from ..services.uow import EmailOp
 
 # Attention! These views are registered on the API app
 
@@ -49,27 +50,28 @@ def verify_access_request_token():
     url = f"{access_request.links['self_html']}?access_request_token={token}"
 
     # todo - move to notifications ( submit action )
-    send_email(
-        {
-            "subject": _("Access request submitted successfully"),
-            "html_body": _(
-                (
-                    "Your access request was submitted successfully. "
-                    'The request details are available <a href="%(url)s">here</a>.'
+    with UnitOfWork() as uow:
+        uow.register(
+            EmailOp(
+                receiver=access_request._request["created_by"]["email"],
+                subject=_("Access request submitted successfully"),
+                html_body=_(
+                    (
+                        "Your access request was submitted successfully. "
+                        'The request details are available <a href="%(url)s">here</a>.'
+                    ),
+                    url=url,
                 ),
-                url=url,
-            ),
-            "body": _(
-                (
-                    "Your access request was submitted successfully. "
-                    "The request details are available at: %(url)s"
+                body=_(
+                    (
+                        "Your access request was submitted successfully. "
+                        "The request details are available at: %(url)s"
+                    ),
+                    url=url,
                 ),
-                url=url,
-            ),
-            "recipients": [access_request._request["created_by"]["email"]],
-            "sender": current_app.config["MAIL_DEFAULT_SENDER"],
-        }
-    )
+            )
+        )
+        uow.commit()
 
     return redirect(url)
 
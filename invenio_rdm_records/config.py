@@ -544,3 +544,13 @@ RDM_RECORDS_MAX_MEDIA_FILES_COUNT = 100
 
 RDM_DATACITE_FUNDER_IDENTIFIERS_PRIORITY = ("ror", "doi", "grid", "isni", "gnd")
 """Priority of funder identifiers types to be used for DataCite serialization."""
+
+RDM_RECORD_STATS_CACHE_FRESH_TTL = 5 * 60
+"""Seconds for which cached record statistics are served without a refresh."""
+
+RDM_RECORD_STATS_CACHE_STALE_TTL = 60 * 60
+"""Seconds for which stale record statistics are served while being refreshed.
+
+After this period, the cache entry expires and the statistics are recomputed
+synchronously on the next access.
+"""
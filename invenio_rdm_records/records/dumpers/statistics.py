@@ -42,8 +42,11 @@ class StatisticsDumperExt(SearchDumperExt):
 
         try:
             parent_data = dict_lookup(data, self.keys, parent=True)
+            # the indexed statistics must not lag behind the aggregations,
+            # so we bypass the cache here (without writing to it, as this is
+            # called for every indexed record, e.g. in the hourly stats reindex)
             parent_data[self.key] = Statistics.get_record_stats(
-                recid=recid, parent_recid=parent_recid
+                recid=recid, parent_recid=parent_recid, cache=False
             )
         except KeyError as e:
             current_app.logger.warning(e)
@@ -11,54 +11,259 @@ In contrast to the very liberal defaults provided by Invenio-Stats, these permis
 factories deny access unless otherwise specified.
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from weakref import WeakKeyDictionary
+
 from flask import current_app
+from invenio_cache import current_cache
+from invenio_search.proxies import current_search_client
 from invenio_stats.proxies import current_stats
+from invenio_stats.queries import TermsQuery
 
 
 class Statistics:
     """Statistics API class."""
 
+    _queries = WeakKeyDictionary()
+    """Built statistics queries, per application."""
+
     @classmethod
     def _get_query(cls, query_name):
-        """Build the statistics query from configuration."""
-        query_config = current_stats.queries[query_name]
-        return query_config.cls(name=query_config.name, **query_config.params)
+        """Get the statistics query built from configuration.
+
+        The query configuration doesn't change over the application's lifetime and
+        the query objects don't keep any state between runs, so they are only built
+        once per application.
+        """
+        app = current_app._get_current_object()
+        queries = cls._queries.setdefault(app, {})
+        query = queries.get(query_name)
+        if query is None:
+            query_config = current_stats.queries[query_name]
+            query = query_config.cls(name=query_config.name, **query_config.params)
+            queries[query_name] = query
+
+        return query
 
     @classmethod
-    def get_record_stats(cls, recid, parent_recid):
-        """Fetch the statistics for the given record."""
+    def _run_query(cls, app, query, **kwargs):
+        """Run the query inside an app context (for worker threads)."""
+        with app.app_context():
+            return query.run(**kwargs)
+
+    @classmethod
+    def _run_queries(cls, queries):
+        """Run the given statistics queries.
+
+        Queries based on the ``TermsQuery`` are batched into a single multi-search
+        request, while any others are run concurrently in separate threads.
+
+        :param queries: List of ``(query_name, kwargs)`` tuples.
+        :returns: List with the result (or the raised exception) for each query.
+        """
+        results = [None] * len(queries)
+        batched, others = [], []
+        for idx, (query_name, kwargs) in enumerate(queries):
+            try:
+                query = cls._get_query(query_name)
+                if isinstance(query, TermsQuery):
+                    query.validate_arguments(None, None, **kwargs)
+                    search = query.build_query(None, None, **kwargs)
+                    batched.append((idx, query, search))
+                else:
+                    others.append((idx, query, kwargs))
+            except Exception as e:
+                results[idx] = e
+
+        if batched:
+            body = []
+            for _, query, search in batched:
+                body.extend([{"index": query.index}, search.to_dict()])
+
+            try:
+                responses = current_search_client.msearch(body=body)["responses"]
+            except Exception as e:
+                responses = [{"error": e}] * len(batched)
+
+            for (idx, query, _), response in zip(batched, responses):
+                if response.get("error"):
+                    # e.g. "index_not_found_exception" when the aggregation
+                    # search index hasn't been created yet
+                    results[idx] = Exception(response["error"])
+                else:
+                    results[idx] = query.process_query_result(response, None, None)
+
+        if others:
+            app = current_app._get_current_object()
+            with ThreadPoolExecutor(max_workers=len(others)) as executor:
+                futures = [
+                    (idx, executor.submit(cls._run_query, app, query, **kwargs))
+                    for idx, query, kwargs in others
+                ]
+
+            for idx, future in futures:
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    results[idx] = e
+
+        return results
+
+    @classmethod
+    def _cache_key(cls, recid, parent_recid):
+        """Build the cache key for the statistics of the given record."""
+        return f"rdm:stats:{recid}:{parent_recid}"
+
+    @classmethod
+    def get_record_stats(cls, recid, parent_recid, cache=True):
+        """Fetch the statistics for the given record.
+
+        The statistics are served from the cache in a stale-while-revalidate fashion:
+        fresh entries are returned as they are, while stale entries are returned
+        and refreshed in the background.
+        If ``cache`` is false, the statistics are always recomputed, without
+        touching the cache.
+        """
+        return cls.get_records_stats_bulk([(recid, parent_recid)], cache=cache)[0]
+
+    @classmethod
+    def get_records_stats_bulk(cls, records, cache=True):
+        """Fetch the statistics for several records at once.
+
+        Works like ``get_record_stats()``, but all statistics that need to be
+        computed are queried with a single multi-search request.
+
+        :param records: List of ``(recid, parent_recid)`` tuples.
+        :returns: List with the statistics for each record, in the same order.
+        """
+        if not cache:
+            return cls._query_records_stats(records)
+
+        cache_keys = [cls._cache_key(*record) for record in records]
         try:
-            views = cls._get_query("record-view").run(recid=recid)
-            views_all = cls._get_query("record-view-all-versions").run(
-                parent_recid=parent_recid
-            )
+            cached = current_cache.get_many(*cache_keys)
         except Exception as e:
-            # e.g. opensearchpy.exceptions.NotFoundError
-            # when the aggregation search index hasn't been created yet
+            # e.g. the cache backend isn't reachable, so we query everything directly
             current_app.logger.warning(e)
+            return cls._query_records_stats(records)
 
-            fallback_result = {
-                "views": 0,
-                "unique_views": 0,
-            }
-            views = views_all = downloads = downloads_all = fallback_result
+        fresh_ttl = current_app.config["RDM_RECORD_STATS_CACHE_FRESH_TTL"]
 
+        results = [None] * len(records)
+        missing = []
+        for idx, (record, cache_key, entry) in enumerate(
+            zip(records, cache_keys, cached)
+        ):
+            if entry is None:
+                missing.append(idx)
+                continue
+
+            stats, timestamp = entry
+            if time.time() - timestamp >= fresh_ttl:
+                cls._schedule_refresh(record, cache_key, fresh_ttl)
+
+            results[idx] = stats
+
+        if missing:
+            computed = cls._refresh_records_stats([records[idx] for idx in missing])
+            for idx, stats in zip(missing, computed):
+                results[idx] = stats
+
+        return results
+
+    @classmethod
+    def _schedule_refresh(cls, record, cache_key, lock_timeout):
+        """Schedule a background refresh of the record's cached statistics."""
+        try:
+            # make sure that only one refresh gets scheduled per stale entry
+            if not current_cache.add(
+                f"{cache_key}:refresh", True, timeout=lock_timeout
+            ):
+                return
+        except Exception as e:
+            # the stale statistics will simply be served a bit longer
+            current_app.logger.warning(e)
+            return
+
+        # avoid circular imports
+        from ...services.tasks import refresh_record_stats
+
+        refresh_record_stats.delay(*record)
+
+    @classmethod
+    def refresh_record_stats(cls, recid, parent_recid):
+        """Compute the statistics for the given record and store them in the cache."""
+        return cls._refresh_records_stats([(recid, parent_recid)])[0]
+
+    @classmethod
+    def _refresh_records_stats(cls, records):
+        """Compute the statistics for the given records and store them in the cache."""
+        records_stats = cls._query_records_stats(records)
+        now = time.time()
         try:
-            downloads = cls._get_query("record-download").run(recid=recid)
-            downloads_all = cls._get_query("record-download-all-versions").run(
-                parent_recid=parent_recid
+            current_cache.set_many(
+                {
+                    cls._cache_key(*record): (stats, now)
+                    for record, stats in zip(records, records_stats)
+                },
+                timeout=current_app.config["RDM_RECORD_STATS_CACHE_STALE_TTL"],
             )
         except Exception as e:
-            # same as above, but for failure in the download statistics
-            # because they are a separate index that can fail independently
+            # the statistics are still valid, they just won't be cached
             current_app.logger.warning(e)
 
-            fallback_result = {
-                "downloads": 0,
-                "unique_downloads": 0,
-                "data_volume": 0,
-            }
-            downloads = downloads_all = fallback_result
+        return records_stats
+
+    @classmethod
+    def _query_records_stats(cls, records):
+        """Query the statistics for the given records from the aggregation indices."""
+        queries = []
+        for recid, parent_recid in records:
+            queries.extend(
+                [
+                    ("record-view", {"recid": recid}),
+                    ("record-view-all-versions", {"parent_recid": parent_recid}),
+                    ("record-download", {"recid": recid}),
+                    ("record-download-all-versions", {"parent_recid": parent_recid}),
+                ]
+            )
+
+        results = cls._run_queries(queries)
+        return [
+            cls._build_record_stats(*results[idx : idx + 4])
+            for idx in range(0, len(results), 4)
+        ]
+
+    @classmethod
+    def _build_record_stats(cls, views, views_all, downloads, downloads_all):
+        """Build the record's statistics from the results of its queries."""
+        for result in (views, views_all):
+            if isinstance(result, Exception):
+                # e.g. opensearchpy.exceptions.NotFoundError
+                # when the aggregation search index hasn't been created yet
+                current_app.logger.warning(result)
+
+                fallback_result = {
+                    "views": 0,
+                    "unique_views": 0,
+                }
+                views = views_all = fallback_result
+                break
+
+        for result in (downloads, downloads_all):
+            if isinstance(result, Exception):
+                # same as above, but for failure in the download statistics
+                # because they are a separate index that can fail independently
+                current_app.logger.warning(result)
+
+                fallback_result = {
+                    "downloads": 0,
+                    "unique_downloads": 0,
+                    "data_volume": 0,
+                }
+                downloads = downloads_all = fallback_result
+                break
 
         stats = {
             "this_version": {
@@ -6,19 +6,24 @@
 # it under the terms of the MIT License; see LICENSE file for more details.
 
 """Access requests for records."""
-from datetime import datetime, timedelta
+from datetime import date, datetime
 
 import marshmallow as ma
 from flask import g
 from invenio_access.permissions import authenticated_user, system_identity
-from invenio_drafts_resources.services.records.uow import ParentRecordCommitOp
 from invenio_i18n import lazy_gettext as _
 from invenio_notifications.services.uow import NotificationOp
+from invenio_records_resources.services import LinksTemplate
 from invenio_requests import current_events_service
 from invenio_requests.customizations import RequestType, actions
 from invenio_requests.customizations.event_types import CommentEventType
+from invenio_search.engine import search
+from invenio_search.proxies import current_search_client
+from invenio_search.utils import build_alias_name
+from markupsafe import escape
 from marshmallow import ValidationError, fields, validates
 from marshmallow_utils.permissions import FieldPermissionsMixin
+from werkzeug.utils import cached_property
 
 from invenio_rdm_records.notifications.builders import (
     GuestAccessRequestAcceptNotificationBuilder,
@@ -28,17 +33,56 @@ from invenio_rdm_records.notifications.builders import (
 )
 
 from ...proxies import current_rdm_records_service as service
+from ...services.uow import register_parent_commit_once
+
+CONFIRMATION_MESSAGE_FORMAT = 'Click <a href="{url}">here</a> to access the record.'
+"""Format of the comment posted after accepting a guest access request."""
 
 
 #
 # Actions
 #
-class UserSubmitAction(actions.SubmitAction):
+class ResolvedTopicMixin:
+    """Mixin for actions that need the request's resolved topic."""
+
+    @cached_property
+    def _resolved_topic(self):
+        """Resolve the request's topic (only once per action)."""
+        return self.request.topic.resolve()
+
+    def _get_topic_title(self):
+        """Get the title of the request's topic, avoiding a full resolve if possible.
+
+        Unless the topic has already been resolved, the title is looked up in the
+        records search index and only as fallback from the resolved record.
+        Note that the indexed title can lag behind the database, e.g. right after
+        the record's metadata has been updated.
+        """
+        record_id = self.request.topic.reference_dict["record"]
+        if "_resolved_topic" in self.__dict__:
+            return self._resolved_topic.metadata["title"]
+
+        try:
+            res = current_search_client.search(
+                index=build_alias_name(service.record_cls.index._name),
+                body={
+                    "query": {"term": {"id": record_id}},
+                    "_source": ["metadata.title"],
+                    "size": 1,
+                },
+            )
+            return res["hits"]["hits"][0]["_source"]["metadata"]["title"]
+        except (search.exceptions.TransportError, IndexError, KeyError):
+            # e.g. the search cluster is unavailable or the record isn't indexed yet
+            return self._resolved_topic.metadata["title"]
+
+
+class UserSubmitAction(ResolvedTopicMixin, actions.SubmitAction):
     """Submit action for user access requests."""
 
     def execute(self, identity, uow):
         """Execute the submit action."""
-        self.request["title"] = self.request.topic.resolve().metadata["title"]
+        self.request["title"] = self._get_topic_title()
         uow.register(
             NotificationOp(
                 UserAccessRequestSubmitNotificationBuilder.build(request=self.request)
@@ -47,13 +91,12 @@ class UserSubmitAction(actions.SubmitAction):
         super().execute(identity, uow)
 
 
-class GuestSubmitAction(actions.SubmitAction):
+class GuestSubmitAction(ResolvedTopicMixin, actions.SubmitAction):
     """Submit action for guest access requests."""
 
     def execute(self, identity, uow):
         """Execute the submit action."""
-        record = self.request.topic.resolve()
-        self.request["title"] = record.metadata["title"]
+        self.request["title"] = self._get_topic_title()
         uow.register(
             NotificationOp(
                 GuestAccessRequestSubmitNotificationBuilder.build(request=self.request)
@@ -62,14 +105,12 @@ class GuestSubmitAction(actions.SubmitAction):
         super().execute(identity, uow)
 
 
-class GuestAcceptAction(actions.AcceptAction):
+class GuestAcceptAction(ResolvedTopicMixin, actions.AcceptAction):
     """Accept action."""
 
     def execute(self, identity, uow):
         """Accept guest access request."""
-        record = service.read(
-            id_=self.request.topic.reference_dict["record"], identity=system_identity
-        )
+        record = self._resolved_topic
         payload = self.request["payload"]
 
         # NOTE: the description isn't translated because it can be changed later
@@ -84,18 +125,18 @@ class GuestAcceptAction(actions.AcceptAction):
 
         # secret link will never expire if secret_link_expiration is empty
         days = int(payload["secret_link_expiration"])
-        # TODO date calculation could be done elsewhere ?
         if days:
-            data["expires_at"] = (
-                (datetime.utcnow() + timedelta(days=days)).date().isoformat()
-            )
-        link = service.access.create_secret_link(identity, record.id, data)
-        access_url = f"{record.links['self_html']}?token={link._link.token}"
+            # use the same "today" for all accepted requests in the unit of work
+            today = getattr(uow, "_today_utc", None)
+            if today is None:
+                today = uow._today_utc = datetime.utcnow().toordinal()
 
-        uow.register(
-            ParentRecordCommitOp(
-                record._record.parent, indexer_context=dict(service=service)
-            )
+            data["expires_at"] = date.fromordinal(today + days).isoformat()
+        link = service.access.create_secret_link(identity, record.pid.pid_value, data)
+        access_url = f"{self._get_self_html_link(record)}?token={link._link.token}"
+
+        register_parent_commit_once(
+            uow, record.parent, indexer_context=dict(service=service)
         )
         uow.register(
             NotificationOp(
@@ -109,9 +150,7 @@ class GuestAcceptAction(actions.AcceptAction):
 
         confirmation_message = {
             "payload": {
-                "content": 'Click <a href="{url}">here</a> to access the record.'.format(
-                    url=access_url
-                )
+                "content": CONFIRMATION_MESSAGE_FORMAT.format(url=escape(access_url))
             }
         }
         current_events_service.create(
@@ -123,14 +162,29 @@ class GuestAcceptAction(actions.AcceptAction):
             notify=False,
         )
 
+    _self_html_links_tpl = None
+    """Links template for only the record's "self_html" link (built lazily)."""
+
+    @classmethod
+    def _get_self_html_link(cls, record):
+        """Generate only the record's "self_html" link.
+
+        This avoids building a result item, whose links would all be expanded.
+        """
+        if cls._self_html_links_tpl is None:
+            cls._self_html_links_tpl = LinksTemplate(
+                {"self_html": service.config.links_item["self_html"]}
+            )
+        return cls._self_html_links_tpl.expand(system_identity, record)["self_html"]
+
 
-class UserAcceptAction(actions.AcceptAction):
+class UserAcceptAction(ResolvedTopicMixin, actions.AcceptAction):
     """Accept action."""
 
     def execute(self, identity, uow):
         """Accept user access request."""
         creator = self.request.created_by.resolve()
-        record = self.request.topic.resolve()
+        record = self._resolved_topic
         permission = self.request["payload"]["permission"]
 
         data = {
@@ -145,8 +199,8 @@ class UserAcceptAction(actions.AcceptAction):
         # NOTE: we're using the system identity here to avoid the grant creation
         #       potentially being blocked by the requesting user's profile visibility
         service.access.create_grant(system_identity, record.pid.pid_value, data)
-        uow.register(
-            ParentRecordCommitOp(record.parent, indexer_context=dict(service=service))
+        register_parent_commit_once(
+            uow, record.parent, indexer_context=dict(service=service)
         )
         uow.register(
             NotificationOp(
@@ -160,6 +214,19 @@ class UserAcceptAction(actions.AcceptAction):
 #
 # Requests
 #
+class GuestAccessRequestPayloadBaseSchema(ma.Schema, FieldPermissionsMixin):
+    """Base schema for the payload of guest access requests."""
+
+    field_load_permissions = {
+        "secret_link_expiration": "manage_access_options",
+    }
+
+    class Meta:
+        """Meta attributes for the schema."""
+
+        unknown = ma.RAISE
+
+
 class UserAccessRequest(RequestType):
     """Access request type coming from a user."""
 
@@ -206,15 +273,7 @@ class GuestAccessRequest(RequestType):
 
     @classmethod
     def _create_payload_cls(cls):
-        class PayloadBaseSchema(ma.Schema, FieldPermissionsMixin):
-            field_load_permissions = {
-                "secret_link_expiration": "manage_access_options",
-            }
-
-            class Meta:
-                unknown = ma.RAISE
-
-        cls.payload_schema_cls = PayloadBaseSchema
+        cls.payload_schema_cls = GuestAccessRequestPayloadBaseSchema
 
     def _update_link_config(self, **context_vars):
         """Fix the prefix required for "self_html"."""
@@ -230,13 +289,8 @@ class GuestAccessRequest(RequestType):
 
     @validates("secret_link_expiration")
     def _validate_days(self, value):
-        try:
-            if int(value) < 0:
-                raise ValidationError(
-                    message="Not a valid number of days.",
-                    field_name="secret_link_expiration",
-                )
-        except ValueError:
+        # only non-negative base-10 integers, without sign or whitespace
+        if not value.isdecimal():
             raise ValidationError(
                 message="Not a valid number of days.",
                 field_name="secret_link_expiration",
@@ -14,6 +14,7 @@ from celery import shared_task
 from celery.schedules import crontab
 from flask import current_app
 from invenio_access.permissions import system_identity
+from invenio_mail.tasks import send_email
 from invenio_search.engine import dsl
 from invenio_search.proxies import current_search_client
 from invenio_search.utils import prefix_index
@@ -22,6 +23,7 @@ from invenio_stats.bookmark import BookmarkAPI
 from invenio_rdm_records.services.signals import post_publish_signal
 
 from ..proxies import current_rdm_records
+from ..records.stats import Statistics
 from .errors import EmbargoNotLiftedError
 
 # runs every hour at minute 10 for a consistent offset from process and aggregate
@@ -88,6 +90,21 @@ def reindex_stats(stats_indices):
     return "%d documents reindexed" % len(all_parents)
 
 
+@shared_task(ignore_result=True)
+def refresh_record_stats(recid, parent_recid):
+    """Refresh the cached statistics for the given record."""
+    Statistics.refresh_record_stats(recid=recid, parent_recid=parent_recid)
+
+
+@shared_task(ignore_result=True)
+def send_emails(emails):
+    """Send out a batch of e-mails from within a single task."""
+    sender = current_app.config["MAIL_DEFAULT_SENDER"]
+    for email in emails:
+        email.setdefault("sender", sender)
+        send_email(email)
+
+
 @shared_task(ignore_result=True)
 def send_post_published_signal(pid):
     """Sends a signal for a published record."""
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2023 TU Wien.
+#
+# Invenio-RDM-Records is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Unit of work operations for RDM services."""
+
+from invenio_drafts_resources.services.records.uow import ParentRecordCommitOp
+from invenio_records_resources.services.uow import Operation
+
+from .tasks import send_emails
+
+
+class EmailOp(Operation):
+    """Send out an e-mail after the transaction has been committed.
+
+    All e-mails registered in the same unit of work are collected and sent out
+    together in a single Celery task.
+    """
+
+    __slots__ = ("receiver", "subject", "html_body", "body")
+
+    def __init__(self, receiver, subject, html_body, body):
+        """Initialize the e-mail operation."""
+        super().__init__()
+        # NOTE: lazy strings are evaluated right away, so that they are translated
+        #       in the current request's locale and can be serialized for Celery
+        self.receiver = receiver
+        self.subject = str(subject)
+        self.html_body = str(html_body)
+        self.body = str(body)
+
+    def on_register(self, uow):
+        """Add the e-mail to the unit of work's batch."""
+        batch = getattr(uow, "_email_batch", None)
+        if batch is None:
+            batch = uow._email_batch = []
+            uow._email_batch_flushed = False
+
+        batch.append(
+            {
+                "subject": self.subject,
+                "html_body": self.html_body,
+                "body": self.body,
+                "recipients": [self.receiver],
+            }
+        )
+
+    def on_post_commit(self, uow):
+        """Send out the whole batch of e-mails (once per unit of work)."""
+        if not uow._email_batch_flushed:
+            send_emails.delay(uow._email_batch)
+            uow._email_batch_flushed = True
+
+
+def register_parent_commit_once(uow, parent, indexer_context=None):
+    """Register a ``ParentRecordCommitOp`` only once per parent in the unit of work.
+
+    The parent is committed every time, but the reindexing of its records
+    (which is the expensive part) only happens once when the unit of work commits.
+    """
+    registered = getattr(uow, "_registered_parent_commits", None)
+    if registered is None:
+        registered = uow._registered_parent_commits = set()
+
+    if parent.id in registered:
+        # this is what the operation would do on registration
+        parent.commit()
+    else:
+        uow.register(ParentRecordCommitOp(parent, indexer_context=indexer_context))
+        registered.add(parent.id)
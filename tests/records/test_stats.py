@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2023 TU Wien.
+#
+# Invenio-RDM-Records is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Test the record statistics API."""
+
+import time
+
+import pytest
+from invenio_stats.queries import TermsQuery
+
+from invenio_rdm_records.records.stats import Statistics
+from invenio_rdm_records.services import tasks
+
+
+def _stats(views):
+    """Build a statistics dictionary with the given number of views."""
+    numbers = {
+        "views": views,
+        "unique_views": views,
+        "downloads": 0,
+        "unique_downloads": 0,
+        "data_volume": 0,
+    }
+    return {"this_version": numbers, "all_versions": numbers}
+
+
+@pytest.fixture()
+def query_stats(mocker):
+    """Replace the statistics queries with a mock returning one view per record."""
+    return mocker.patch.object(
+        Statistics,
+        "_query_records_stats",
+        side_effect=lambda records: [_stats(1) for _ in records],
+    )
+
+
+@pytest.fixture()
+def refresh_task(mocker):
+    """Mock the scheduling of the background refresh task."""
+    return mocker.patch.object(tasks.refresh_record_stats, "delay")
+
+
+def test_stats_cache_missing(app, cache, query_stats, refresh_task):
+    """Missing statistics are computed synchronously and cached."""
+    assert Statistics.get_record_stats("abcd-1234", "efgh-5678") == _stats(1)
+    assert query_stats.call_count == 1
+    assert not refresh_task.called
+
+    stats, _ = cache.get(Statistics._cache_key("abcd-1234", "efgh-5678"))
+    assert stats == _stats(1)
+
+
+def test_stats_cache_fresh(app, cache, query_stats, refresh_task):
+    """Fresh statistics are served from the cache."""
+    cache_key = Statistics._cache_key("abcd-1234", "efgh-5678")
+    cache.set(cache_key, (_stats(5), time.time()))
+
+    assert Statistics.get_record_stats("abcd-1234", "efgh-5678") == _stats(5)
+    assert not query_stats.called
+    assert not refresh_task.called
+
+
+def test_stats_cache_stale(app, cache, query_stats, refresh_task):
+    """Stale statistics are served while a refresh is scheduled (only once)."""
+    fresh_ttl = app.config["RDM_RECORD_STATS_CACHE_FRESH_TTL"]
+    cache_key = Statistics._cache_key("abcd-1234", "efgh-5678")
+    cache.set(cache_key, (_stats(5), time.time() - fresh_ttl - 1))
+
+    assert Statistics.get_record_stats("abcd-1234", "efgh-5678") == _stats(5)
+    assert Statistics.get_record_stats("abcd-1234", "efgh-5678") == _stats(5)
+    assert not query_stats.called
+    refresh_task.assert_called_once_with("abcd-1234", "efgh-5678")
+
+
+def test_stats_cache_bypass(app, cache, query_stats, refresh_task):
+    """Bypassing the cache recomputes the statistics without writing them."""
+    cache_key = Statistics._cache_key("abcd-1234", "efgh-5678")
+    cache.set(cache_key, (_stats(5), time.time()))
+
+    stats = Statistics.get_record_stats("abcd-1234", "efgh-5678", cache=False)
+    assert stats == _stats(1)
+    assert query_stats.call_count == 1
+    assert cache.get(cache_key)[0] == _stats(5)
+
+
+def test_stats_cache_unavailable(app, cache, query_stats, refresh_task, mocker):
+    """Failures of the cache backend fall back to querying the statistics."""
+    broken_cache = mocker.patch("invenio_rdm_records.records.stats.api.current_cache")
+    broken_cache.get_many.side_effect = ConnectionError("cache is down")
+    broken_cache.set_many.side_effect = ConnectionError("cache is down")
+
+    assert Statistics.get_record_stats("abcd-1234", "efgh-5678") == _stats(1)
+    stats = Statistics.get_record_stats("abcd-1234", "efgh-5678", cache=False)
+    assert stats == _stats(1)
+    assert query_stats.call_count == 2
+
+
+def test_stats_bulk(app, cache, query_stats, refresh_task):
+    """Fresh, stale and missing entries are handled together, in input order."""
+    query_stats.side_effect = lambda records: [
+        _stats(int(recid)) for recid, _ in records
+    ]
+    fresh_ttl = app.config["RDM_RECORD_STATS_CACHE_FRESH_TTL"]
+    records = [("1", "p1"), ("2", "p2"), ("3", "p3"), ("4", "p4")]
+    cache.set(Statistics._cache_key("1", "p1"), (_stats(10), time.time()))
+    cache.set(
+        Statistics._cache_key("3", "p3"), (_stats(30), time.time() - fresh_ttl - 1)
+    )
+
+    assert Statistics.get_records_stats_bulk(records) == [
+        _stats(10),
+        _stats(2),
+        _stats(30),
+        _stats(4),
+    ]
+
+    # only the missing records get queried (together) and written to the cache
+    query_stats.assert_called_once_with([("2", "p2"), ("4", "p4")])
+    assert cache.get(Statistics._cache_key("2", "p2"))[0] == _stats(2)
+    assert cache.get(Statistics._cache_key("4", "p4"))[0] == _stats(4)
+    assert cache.get(Statistics._cache_key("1", "p1"))[0] == _stats(10)
+    assert cache.get(Statistics._cache_key("3", "p3"))[0] == _stats(30)
+    refresh_task.assert_called_once_with("3", "p3")
+
+
+#
+# Batched statistics queries
+#
+@pytest.fixture()
+def terms_queries(app, mocker):
+    """Statistics queries as configured in InvenioRDM."""
+    view_metrics = {
+        "views": ("sum", "count", {}),
+        "unique_views": ("sum", "unique_count", {}),
+    }
+    download_metrics = {
+        "downloads": ("sum", "count", {}),
+        "unique_downloads": ("sum", "unique_count", {}),
+        "data_volume": ("sum", "volume", {}),
+    }
+    queries = {
+        "record-view": TermsQuery(
+            name="record-view",
+            index="stats-record-view",
+            required_filters={"recid": "recid"},
+            metric_fields=view_metrics,
+        ),
+        "record-view-all-versions": TermsQuery(
+            name="record-view-all-versions",
+            index="stats-record-view",
+            required_filters={"parent_recid": "parent_recid"},
+            metric_fields=view_metrics,
+        ),
+        "record-download": TermsQuery(
+            name="record-download",
+            index="stats-file-download",
+            required_filters={"recid": "recid"},
+            metric_fields=download_metrics,
+        ),
+        "record-download-all-versions": TermsQuery(
+            name="record-download-all-versions",
+            index="stats-file-download",
+            required_filters={"parent_recid": "parent_recid"},
+            metric_fields=download_metrics,
+        ),
+    }
+    mocker.patch.object(Statistics, "_get_query", side_effect=queries.__getitem__)
+    return queries
+
+
+@pytest.fixture()
+def msearch(mocker):
+    """Mock the multi-search request to the search cluster."""
+    client = mocker.patch("invenio_rdm_records.records.stats.api.current_search_client")
+    return client.msearch
+
+
+def _response(**metrics):
+    """Build an aggregation search response with the given metric values."""
+    return {
+        "hits": {"total": {"value": 0}, "hits": []},
+        "aggregations": {name: {"value": value} for name, value in metrics.items()},
+    }
+
+
+def _views(views, unique_views):
+    """Build a response for a views query."""
+    return _response(views=views, unique_views=unique_views)
+
+
+def _downloads(downloads, unique_downloads, data_volume):
+    """Build a response for a downloads query."""
+    return _response(
+        downloads=downloads,
+        unique_downloads=unique_downloads,
+        data_volume=data_volume,
+    )
+
+
+def test_stats_msearch(app, cache, terms_queries, msearch):
+    """All queries are sent in a single request and mapped back in order."""
+    msearch.return_value = {
+        "responses": [
+            _views(1, 2),
+            _views(3, 4),
+            _downloads(5, 6, 7),
+            _downloads(8, 9, 10),
+        ]
+    }
+
+    stats = Statistics.get_record_stats("abcd-1234", "efgh-5678", cache=False)
+    assert stats == {
+        "this_version": {
+            "views": 1,
+            "unique_views": 2,
+            "downloads": 5,
+            "unique_downloads": 6,
+            "data_volume": 7,
+        },
+        "all_versions": {
+            "views": 3,
+            "unique_views": 4,
+            "downloads": 8,
+            "unique_downloads": 9,
+            "data_volume": 10,
+        },
+    }
+
+    msearch.assert_called_once()
+    body = msearch.call_args.kwargs["body"]
+    headers, searches = body[::2], body[1::2]
+    assert [header["index"] for header in headers] == [
+        query.index for query in terms_queries.values()
+    ]
+    assert "abcd-1234" in str(searches[0]) and "abcd-1234" in str(searches[2])
+    assert "efgh-5678" in str(searches[1]) and "efgh-5678" in str(searches[3])
+
+
+def test_stats_msearch_index_error(app, cache, terms_queries, msearch):
+    """An error for the download index only zeroes the download statistics."""
+    error = {"error": {"type": "index_not_found_exception"}, "status": 404}
+    msearch.return_value = {
+        "responses": [_views(1, 2), _views(3, 4), error, error],
+    }
+
+    stats = Statistics.get_record_stats("abcd-1234", "efgh-5678", cache=False)
+    assert stats["this_version"] == {
+        "views": 1,
+        "unique_views": 2,
+        "downloads": 0,
+        "unique_downloads": 0,
+        "data_volume": 0,
+    }
+    assert stats["all_versions"] == {
+        "views": 3,
+        "unique_views": 4,
+        "downloads": 0,
+        "unique_downloads": 0,
+        "data_volume": 0,
+    }
+
+
+def test_stats_msearch_request_error(app, cache, terms_queries, msearch):
+    """A failure of the whole multi-search request zeroes all statistics."""
+    msearch.side_effect = ConnectionError("search cluster is down")
+
+    stats = Statistics.get_record_stats("abcd-1234", "efgh-5678", cache=False)
+    assert stats == _stats(0)
+
+
+def test_stats_msearch_bulk(app, cache, terms_queries, msearch):
+    """The queries for several records are sent in a single request."""
+    msearch.return_value = {
+        "responses": [
+            _views(1, 1),
+            _views(2, 2),
+            _downloads(3, 3, 3),
+            _downloads(4, 4, 4),
+            _views(5, 5),
+            _views(6, 6),
+            _downloads(7, 7, 7),
+            _downloads(8, 8, 8),
+        ]
+    }
+
+    first, second = Statistics.get_records_stats_bulk(
+        [("abcd-1234", "efgh-5678"), ("ijkl-1234", "mnop-5678")], cache=False
+    )
+    assert first["this_version"]["views"] == 1
+    assert first["all_versions"]["downloads"] == 4
+    assert second["this_version"]["views"] == 5
+    assert second["all_versions"]["downloads"] == 8
+
+    msearch.assert_called_once()
+    searches = msearch.call_args.kwargs["body"][1::2]
+    assert "abcd-1234" in str(searches[0]) and "ijkl-1234" in str(searches[4])
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2023 TU Wien.
+#
+# Invenio-RDM-Records is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Test access requests."""
+
+import pytest
+from marshmallow import ValidationError
+
+from invenio_rdm_records.requests.access import GuestAccessRequest
+from invenio_rdm_records.requests.access.requests import UserSubmitAction
+
+
+@pytest.mark.parametrize("value", ["²", "-1", "", "+7", " 7"])
+def test_guest_access_request_invalid_days(value):
+    """Values that aren't non-negative integers are rejected."""
+    with pytest.raises(ValidationError):
+        GuestAccessRequest()._validate_days(value)
+
+
+def test_guest_access_request_valid_days():
+    """Non-negative integers are accepted."""
+    GuestAccessRequest()._validate_days("7")
+
+
+@pytest.fixture()
+def submit_action(mocker):
+    """Submit action for a mocked access request."""
+    request = mocker.Mock()
+    request.topic.reference_dict = {"record": "abcd-1234"}
+    request.topic.resolve.return_value.metadata = {"title": "Resolved title"}
+    return UserSubmitAction(request)
+
+
+@pytest.fixture()
+def search_client(mocker):
+    """Mock the search client used for looking up the topic's title."""
+    return mocker.patch(
+        "invenio_rdm_records.requests.access.requests.current_search_client"
+    )
+
+
+def test_topic_title_from_index(app, submit_action, search_client):
+    """The title is taken from the search index without resolving the record."""
+    search_client.search.return_value = {
+        "hits": {"hits": [{"_source": {"metadata": {"title": "Indexed title"}}}]}
+    }
+
+    assert submit_action._get_topic_title() == "Indexed title"
+    assert not submit_action.request.topic.resolve.called
+
+
+def test_topic_title_not_indexed(app, submit_action, search_client):
+    """If the record isn't indexed, the title is taken from the resolved record."""
+    search_client.search.return_value = {"hits": {"hits": []}}
+
+    assert submit_action._get_topic_title() == "Resolved title"
+    submit_action.request.topic.resolve.assert_called_once()
+
+
+def test_topic_title_already_resolved(app, submit_action, search_client):
+    """If the record has been resolved already, the index isn't queried."""
+    submit_action._resolved_topic
+
+    assert submit_action._get_topic_title() == "Resolved title"
+    assert not search_client.search.called
+    submit_action.request.topic.resolve.assert_called_once()
@@ -11,6 +11,7 @@ import copy
 import io
 import re
 import urllib
+from datetime import timedelta
 
 from flask_principal import UserNeed
 from flask_security import login_user
@@ -23,10 +24,16 @@ from invenio_access.permissions import (
 from invenio_accounts.proxies import current_datastore
 from invenio_accounts.testutils import login_user_via_session
 from invenio_db import db
-from invenio_requests.proxies import current_requests_service
+from invenio_requests.proxies import (
+    current_events_service,
+    current_requests_service,
+)
 
 from invenio_rdm_records.proxies import current_rdm_records_service as service
-from invenio_rdm_records.requests.access import AccessRequestTokenNeed
+from invenio_rdm_records.requests.access import (
+    AccessRequestToken,
+    AccessRequestTokenNeed,
+)
 
 
 def test_simple_guest_access_request_flow(running_app, client, users, minimal_record):
@@ -111,10 +118,19 @@ def test_simple_guest_access_request_flow(running_app, client, users, minimal_re
         match = link_regex.search(str(success_message.body))
         assert match
         access_url = match.group(1)
+        assert f"/records/{record.id}?token=" in access_url
         parsed = urllib.parse.urlparse(access_url)
         args = {k: v for k, v in [kv.split("=") for kv in parsed.query.split("&")]}
         assert "token" in args
 
+        # The same link is posted as confirmation comment on the request
+        current_events_service.record_cls.index.refresh()
+        events = current_events_service.search(identity, request.id).to_dict()
+        comments = [
+            hit.get("payload", {}).get("content", "") for hit in events["hits"]["hits"]
+        ]
+        assert any(f"/records/{record.id}?token=" in c for c in comments)
+
         # The user can now access the record and its files via the secret link
         assert (
             client.get(f"/records/{record.id}?token={args['token']}").status_code == 200
@@ -219,6 +235,58 @@ def test_simple_user_access_request_flow(running_app, client, users, minimal_rec
         }
 
 
+def test_accept_guest_access_requests_in_same_request(
+    running_app, users, minimal_record
+):
+    """Test accepting several access requests for a record in the same request."""
+    record_owner, _ = users
+    identity = Identity(record_owner.id)
+    identity.provides.add(any_user)
+    identity.provides.add(authenticated_user)
+    identity.provides.add(UserNeed(record_owner.id))
+    guest_identity = Identity(None)
+    guest_identity.provides.add(any_user)
+
+    # Create a public record with restricted files
+    record_json = copy.deepcopy(minimal_record)
+    record_json["access"]["record"] = "public"
+    record_json["access"]["files"] = "restricted"
+    draft = service.create(identity=identity, data=record_json)
+    record = service.publish(identity=identity, id_=draft.id)
+
+    # Two guests request access to the same record
+    requests = []
+    for name in ["Eric Idle", "John Cleese"]:
+        access_token = AccessRequestToken.create(
+            email=f"{name.split()[0].lower()}@montypython.com",
+            full_name=name,
+            message="This is not spam!",
+            record_pid=record.id,
+            shelf_life=timedelta(hours=6),
+            consent=True,
+        )
+        db.session.commit()
+        requests.append(
+            service.access.create_guest_access_request(
+                identity=guest_identity, token=access_token.token
+            )
+        )
+
+    # Both requests get accepted while handling the same (HTTP) request
+    with running_app.app.test_request_context():
+        for request in requests:
+            current_requests_service.execute_action(
+                identity, request.id, "accept", data={}
+            )
+
+    # Neither accept action may have overwritten the secret link of the other
+    record = service.read(identity=identity, id_=record.id)
+    secret_links = record._obj.parent.access.links
+    assert sorted(link.resolve().origin for link in secret_links) == sorted(
+        f"request:{request.id}" for request in requests
+    )
+
+
 def test_access_grant_for_user(
     running_app,
     client,
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2023 TU Wien.
+#
+# Invenio-RDM-Records is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Unit of work operations tests."""
+
+from invenio_drafts_resources.services.records.uow import ParentRecordCommitOp
+from invenio_i18n import lazy_gettext as _
+from invenio_records_resources.services.uow import UnitOfWork
+from kombu.serialization import dumps
+
+from invenio_rdm_records.services import tasks
+from invenio_rdm_records.services.uow import EmailOp, register_parent_commit_once
+
+
+def test_email_op_batching(app, db, mocker):
+    """All e-mails of a unit of work are sent out with a single task."""
+    send_emails = mocker.patch.object(tasks.send_emails, "delay")
+
+    with UnitOfWork(db.session) as uow:
+        for receiver in ["first@example.org", "second@example.org"]:
+            uow.register(
+                EmailOp(
+                    receiver=receiver,
+                    subject=_("Access request submitted successfully"),
+                    html_body=_("<p>Hello</p>"),
+                    body=_("Hello"),
+                )
+            )
+        uow.commit()
+
+    send_emails.assert_called_once()
+    (emails,) = send_emails.call_args.args
+    assert [email["recipients"] for email in emails] == [
+        ["first@example.org"],
+        ["second@example.org"],
+    ]
+    assert emails[0]["subject"] == "Access request submitted successfully"
+
+    # the batch is passed on as task argument, so it has to be serializable
+    dumps(emails, serializer="json")
+
+
+def test_register_parent_commit_once(app, db, parent, mocker):
+    """The parent is committed each time, but its operation registered once."""
+    commit = mocker.spy(parent, "commit")
+
+    with UnitOfWork(db.session) as uow:
+        register = mocker.spy(uow, "register")
+        register_parent_commit_once(uow, parent)
+        register_parent_commit_once(uow, parent)
+
+        assert register.call_count == 1
+        assert isinstance(register.call_args.args[0], ParentRecordCommitOp)
+        assert commit.call_count == 2
+        uow.commit()